@@ -1,23 +1,50 @@
 #!/usr/bin/env python3
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Iterator, Optional
 import argparse
+import hashlib
 import os
+import sys
 
-from helpers import misc, render, dir_tree
+from helpers import misc, render, dir_tree, coverage
+from helpers.cache import ParseCache, blob_sha
+from helpers.git_source import GitSource
+from helpers.workers import SupervisedPool
 
 
 class Parser(ABC):
-    def __init__(self):
+    # name of language (key in parser registry), title and template rendering the details of parsed files
+    language = None
+    title = None
+    files_template = None
+    # additional search path for templates of parsers shipped by other packages
+    template_dir = None
+    # keys of each element of the "elements" list every parse result contains (in addition to its language specific keys);
+    # kind is e.g. "function", "class", "method" or "module", docstring and line numbers may be None
+    ELEMENT_KEYS = ("name", "kind", "docstring", "lineno_start", "lineno_end")
+    # version of parse_file results stored in the parse cache; the cache namespace also contains a hash of the source of the
+    # parser class and its base classes, so this only needs to be increased when parse_file depends on changed code elsewhere
+    cache_version = 1
+
+    def __init__(self, args: Optional[argparse.Namespace]=None):
         """docs_exclude"""
         # enforce list of str type in target_file_extensions
         ext = self.target_file_extensions
         if not isinstance(ext, list) or not all(isinstance(e, str) for e in ext):
             raise TypeError("target_file_extensions must be a list of str")
 
-        # argparse init
-        self.args = self.create_arg_parser().parse_args()
+        # argparse init (parsers used by another parser share its parsed arguments)
+        self.args = self.create_arg_parser().parse_args() if args is None else args
+
+        self.cache = ParseCache(self.args.cache_dir) if self.args.cache_dir else None
+        self.__git_source = None
+        self.__git_blobs = {}
+        self.__sources = {}
+        self.__pending_files = []
+        self.__cache_namespaces = {}
+        self.parse_stats = {}
+        self.coverage = {}
 
 
     @property
@@ -33,9 +60,58 @@ class Parser(ABC):
         pass
 
 
-    @abstractmethod
     def make_docs(self):
-        """subclasses must implement make_docs method with all steps required to generate AsciiDoc output"""
+        """generates AsciiDoc documentation (or prints the dir tree if no output is specified) from all targeted files"""
+        combined_ast = self.get_combined_ast()
+
+        list_of_files = self.combined_ast_to_list_of_files(combined_ast)
+
+        if self.args.output == None:
+            for line in self.iter_dir_tree(combined_ast):
+                print(line)
+        else:
+            data = {
+                "dir_tree": self.make_dir_tree(combined_ast),
+                "list_of_files": list_of_files,
+                "parse_stats": self.parse_stats,
+                "coverage": self.coverage
+            }
+            data.update(self.template_data(list_of_files))
+            self.render_file_template(self.args.template_dir, self.args.template, data)
+
+
+    def template_data(self, list_of_files: list) -> dict:
+        """additional template variables; subclasses can override this to add language specific data"""
+        return {}
+
+
+    def postprocess_file(self, file: dict) -> None:
+        """called for each file of the flattened list of files; subclasses can override this to add derived data"""
+        pass
+
+
+    def parser_for(self, path: str) -> "Parser":
+        """parser responsible for targeted file; parsers dispatching files to other parsers override this"""
+        return self
+
+
+    def empty_result(self) -> dict:
+        """contents of a file that was skipped or could not be parsed; subclasses must extend it with the other keys returned by parse_file
+
+        every result of parse_file must contain all keys of empty_result, which always include the common "elements" list (see ELEMENT_KEYS)
+        """
+        return {"elements": []}
+
+
+    def count_documentation(self, contents: dict) -> tuple[int, int]:
+        """number of documented and documentable elements in contents of a parsed file; by default all elements and the ones with a docstring"""
+        elements = contents["elements"]
+        return sum(e["docstring"] is not None for e in elements), len(elements)
+
+
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser) -> None:
+        """subclasses can add their own command line options here (they are also available when used by another parser)"""
         pass
 
 
@@ -46,6 +122,18 @@ class Parser(ABC):
         search_opts.add_argument("search_dir", help="root directory for recursive search of targeted files")
         search_opts.add_argument("-e", "--exclude", nargs="*", default=None, help="[regex] exclude matching files and directories from search")
         search_opts.add_argument("--max-depth", type=int, default=None, help="max search depth (num of directories)")
+        search_opts.add_argument("--git-rev", default=None, help="read files from this revision of the git repository containing search_dir instead of the working tree")
+        search_opts.add_argument("--cache-dir", default=None, help="directory for caching parse results (keyed by git blob sha)")
+
+        limit_opts = parser.add_argument_group('Resource Limits')
+        limit_opts.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes for parsing files")
+        limit_opts.add_argument("--timeout", type=float, default=None, help="max time (in seconds) for parsing a single file; parses run in supervised worker processes")
+        limit_opts.add_argument("--max-memory", type=int, default=None, help="max memory (in MB) of each worker process; parses run in supervised worker processes")
+        limit_opts.add_argument("--max-file-size", type=int, default=None, help="skip files larger than this (in MB)")
+
+        coverage_opts = parser.add_argument_group('Coverage Options')
+        coverage_opts.add_argument("--coverage-report", default=None, help="path/to/report.json or .csv with documentation coverage per file and directory")
+        coverage_opts.add_argument("--coverage-threshold", type=float, default=None, help="exit with code 1 if overall documentation coverage (in percent) is below this or any file could not be parsed (files skipped by --max-file-size are ignored)")
 
         adoc_opts = parser.add_argument_group('AsciiDoc Options')
         adoc_opts.add_argument("-o", "--output", default=None, help="path/to/output.adoc")
@@ -54,6 +142,11 @@ class Parser(ABC):
         adoc_opts.add_argument("-i", "--include", nargs="*", default=None, help="[regex] include only matching files and directories in generated output")
         adoc_opts.add_argument("--adoc-links", action="store_true", help="dir_tree: render relative links instead of bare filenames")
         adoc_opts.add_argument("--adoc-anchors", action="store_true", help="dir_tree: add link to anchor of details section for each included file")
+        adoc_opts.add_argument("--tree-max-depth", type=int, default=None, help="dir_tree: collapse contents of directories deeper than this (num of directories) into a summary line")
+        adoc_opts.add_argument("--tree-max-files", type=int, default=None, help="dir_tree: collapse files of directories containing more files than this into a summary line")
+        adoc_opts.add_argument("--tree-counts", action="store_true", help="dir_tree: add aggregate counts (files, functions, classes, modules) to each directory")
+
+        self.add_arguments(parser)
 
         return parser
 
@@ -66,17 +159,36 @@ class Parser(ABC):
         exclude_filters = self.args.exclude if self.args.exclude != None else []
         max_depth = self.args.max_depth
 
+        # files are collected first and parsed afterwards so parses can be distributed to worker processes
+        if self.args.git_rev is None:
+            contents = self.__scan_directory(root_path, root_path, exclude_filters, max_depth)
+            self.__parse_files()
+        else:
+            with GitSource(root_path, self.args.git_rev) as self.__git_source:
+                contents = self.__scan_git_tree(root_path, exclude_filters, max_depth)
+                self.__parse_files()
+            self.__git_source = None
+            self.__git_blobs = {}
+
         result = {
             f"{root_path_basename}": {
                     "type": "directory",
                     "rel_path": ".",
-                    "contents": self.__scan_directory(root_path, root_path, exclude_filters, max_depth)
+                    "contents": contents
                 }
             }
 
         result_pruned = self.__prune_ast(result)
         result_w_idx = self.__add_file_idx(result_pruned)
 
+        # coverage counters of files are added while parsing and summed up per directory by add_file_idx
+        root = next(iter(result_w_idx.values())) if result_w_idx else {}
+        self.coverage = dict(root.get("coverage") or {"documented": 0, "total": 0})
+        self.coverage["percent"] = coverage.coverage_percent(self.coverage)
+
+        if self.args.coverage_report is not None:
+            coverage.write_report(self.args.coverage_report, result_w_idx)
+
         return result_w_idx
 
 
@@ -124,18 +236,237 @@ class Parser(ABC):
                     "rel_path": rel_path,
                     "contents": self.__scan_directory(full_path, root_path, exclude_filters, max_depth, current_depth + 1)
                 }
-            else:
-                for ext in self.target_file_extensions:
-                    if entry.endswith(ext):
-                        result[basename] = {
-                            "type": "file",
-                            "rel_path": rel_path,
-                            "contents": self.parse_file(full_path)
-                        }
+            elif any(entry.endswith(ext) for ext in self.target_file_extensions):
+                # checked once per file, extensions of different parsers may overlap (e.g. ".d.ts" and ".ts")
+                result[basename] = {
+                    "type": "file",
+                    "rel_path": rel_path,
+                    "contents": None
+                }
+                self.__pending_files.append((result[basename], full_path, None, os.path.getsize(full_path)))
+
+        return result
+
+
+    def __scan_git_tree(self, root_path: str, exclude_filters: Optional[list[str]]=None, max_depth: Optional[int]=None):
+        """assembles combined abstract syntax tree from the files of a git revision (same structure as __scan_directory); docs_exclude
+
+        Parameters
+        ----------
+        root_path:       str
+                         root_path of search (inside of git repository)
+        exclude_filters: list of str, optional
+                         list of exclude filters (regex) to exclude files/paths from search
+        max_depth:       int, optional
+                         maximum directory depth
+
+        Returns
+        -------
+        dict
+            contents of root directory
+        """
+        result = {}
+        excluded = {}
+
+        for rel_path, sha, size in self.__git_source.list_files():
+            if not any(rel_path.endswith(ext) for ext in self.target_file_extensions):
+                continue
+
+            parts = rel_path.split("/")
+            if max_depth is not None and len(parts) - 1 > max_depth:
+                continue
+
+            # like the directory walk, a path is excluded if the file or any of its parent directories match
+            parent_paths = ["/".join(parts[:i + 1]) for i in range(len(parts))]
+            for p in parent_paths:
+                if p not in excluded:
+                    excluded[p] = self.matches_any_regex(p, exclude_filters)
+            if any(excluded[p] for p in parent_paths):
+                continue
+
+            node = result
+            for name, dir_path in zip(parts[:-1], parent_paths):
+                node = node.setdefault(name, {"type": "directory", "rel_path": dir_path, "contents": {}})["contents"]
+
+            full_path = os.path.join(root_path, rel_path)
+            self.__git_blobs[full_path] = sha
+            node[parts[-1]] = {
+                "type": "file",
+                "rel_path": rel_path,
+                "contents": None
+            }
+            self.__pending_files.append((node[parts[-1]], full_path, sha, size))
 
         return result
 
 
+    def __parse_files(self) -> None:
+        """parses all files collected by the scan and stores results in their nodes; docs_exclude
+
+        files exceeding --max-file-size and files whose parse fails, times out or exceeds --max-memory are skipped
+        and recorded in the node (key "skipped") instead of aborting the run
+        """
+        files, self.__pending_files = self.__pending_files, []
+        self.parse_stats = {"parsed": 0, "cached": 0, "skipped": {}}
+        max_file_size = self.args.max_file_size * 1024 * 1024 if self.args.max_file_size is not None else None
+
+        to_parse = []
+        for node, full_path, sha, size in files:
+            node["language"] = self.parser_for(full_path).language
+
+            if max_file_size is not None and size > max_file_size:
+                self.__skip_file(node, "size", f"file size of {size} bytes exceeds limit of {max_file_size} bytes")
+                continue
+
+            if self.cache is not None:
+                if sha is None:
+                    with open(full_path, "rb") as f:
+                        sha = blob_sha(f.read())
+
+                cached = self.cache.get(sha, self.__cache_namespace(full_path))
+                if cached is not None:
+                    self.__store_contents(node, cached)
+                    self.parse_stats["cached"] += 1
+                    continue
+
+            to_parse.append((node, full_path, sha))
+
+        if self.args.jobs > 1 or self.args.timeout is not None or self.args.max_memory is not None:
+            pool = SupervisedPool(
+                self.parse_source,
+                num_workers=self.args.jobs,
+                timeout=self.args.timeout,
+                max_memory=self.args.max_memory * 1024 * 1024 if self.args.max_memory is not None else None
+            )
+            # git blobs are read by this process, workers must not share the cat-file process
+            tasks = ((full_path, self.read_source(full_path) if full_path in self.__git_blobs else None) for _, full_path, _ in to_parse)
+            results = pool.run(tasks)
+        else:
+            results = (self.__parse_in_process(i, full_path) for i, (_, full_path, _) in enumerate(to_parse))
+
+        for i, status, value in results:
+            node, full_path, sha = to_parse[i]
+            if status == "ok":
+                status, value = self.__check_result(full_path, value)
+
+            if status != "ok":
+                self.__skip_file(node, status, value)
+                continue
+
+            self.__store_contents(node, value)
+            self.parse_stats["parsed"] += 1
+            if self.cache is not None:
+                self.cache.set(sha, self.__cache_namespace(full_path), value)
+
+        skipped = self.parse_stats["skipped"]
+        if skipped:
+            print(f"Skipped {sum(skipped.values())} file(s): " + ", ".join(f"{n} {reason}" for reason, n in skipped.items()), file=sys.stderr)
+
+
+    def __check_result(self, full_path: str, result: dict) -> tuple[str, dict | str]:
+        """docs_exclude"""
+        # parsers of other packages may not follow the common schema, their files are skipped instead of breaking templates
+        missing = [key for key in self.parser_for(full_path).empty_result() if key not in result]
+        if missing:
+            return "error", f"parse result is missing key(s) {', '.join(missing)}"
+
+        for elem in result["elements"]:
+            missing = [key for key in self.ELEMENT_KEYS if key not in elem]
+            if missing:
+                return "error", f"element of parse result is missing key(s) {', '.join(missing)}"
+
+        return "ok", result
+
+
+    def __store_contents(self, node: dict, contents: dict) -> None:
+        """docs_exclude"""
+        documented, total = self.parser_for(node["rel_path"]).count_documentation(contents)
+        node["contents"] = contents
+        node["coverage"] = {"documented": documented, "total": total}
+
+
+    def __parse_in_process(self, idx: int, full_path: str) -> tuple:
+        """docs_exclude"""
+        try:
+            return idx, "ok", self.parse_file(full_path)
+        except MemoryError:
+            return idx, "memory", "memory limit exceeded"
+        except Exception as e:
+            return idx, "error", f"{type(e).__name__}: {e}"
+
+
+    def __cache_namespace(self, full_path: str) -> str:
+        """docs_exclude"""
+        parser_class = type(self.parser_for(full_path))
+        if parser_class not in self.__cache_namespaces:
+            # results of a changed parser are never served from the cache, independent of cache_version
+            source_hash = hashlib.sha1()
+            for cls in parser_class.__mro__:
+                source_file = getattr(sys.modules.get(cls.__module__), "__file__", None)
+                if source_file is not None:
+                    with open(source_file, "rb") as f:
+                        source_hash.update(f.read())
+
+            self.__cache_namespaces[parser_class] = os.path.join(parser_class.__name__, f"v{parser_class.cache_version}-{source_hash.hexdigest()[:12]}")
+
+        return self.__cache_namespaces[parser_class]
+
+
+    def parse_source(self, full_path: str, source: Optional[str]=None) -> dict:
+        """parses targeted file using parse_file, but with given source instead of reading it from disk or git
+
+        Parameters
+        ----------
+        full_path: str
+                   absolute path to target file
+        source:    str, optional
+                   contents of file; read by read_source if not provided
+
+        Returns
+        -------
+        dict
+            result of parse_file
+        """
+        if source is not None:
+            self.__sources[full_path] = source
+        try:
+            return self.parse_file(full_path)
+        finally:
+            self.__sources.pop(full_path, None)
+
+
+    def __skip_file(self, node: dict, reason: str, detail: str) -> None:
+        """docs_exclude"""
+        print(f"Skipping {node['rel_path']} ({reason}): {detail}", file=sys.stderr)
+        node["contents"] = self.parser_for(node["rel_path"]).empty_result()
+        node["coverage"] = {"documented": 0, "total": 0}
+        node["skipped"] = {"reason": reason, "detail": detail}
+        self.parse_stats["skipped"][reason] = self.parse_stats["skipped"].get(reason, 0) + 1
+
+
+    def read_source(self, full_path: str) -> str:
+        """reads source of targeted file from disk or, if --git-rev is set, from the corresponding git blob
+
+        Parameters
+        ----------
+        full_path: str
+                   absolute path to target file
+
+        Returns
+        -------
+        str
+            contents of file
+        """
+        if full_path in self.__sources:
+            return self.__sources[full_path]
+
+        if full_path in self.__git_blobs:
+            return self.__git_source.read_blob(self.__git_blobs[full_path])
+
+        with open(full_path, "r") as f:
+            return f.read()
+
+
     def __prune_ast(self, combined_ast: dict) -> dict | None:
         """docs_exclude"""
         return dir_tree.prune_ast(combined_ast, self.args.include)
@@ -146,12 +477,88 @@ class Parser(ABC):
         return dir_tree.add_file_idx(combined_ast)
 
 
-    def render_file_template(self, template_dir: str, template: str, data: dict) -> None:
+    def check_coverage(self) -> int:
+        """checks overall documentation coverage of the last get_combined_ast run against --coverage-threshold
+
+        files that failed to parse (error, timeout, memory or crash) can't be evaluated (they count as 0 of 0 elements),
+        so the check fails if any of them was skipped; files skipped on purpose by --max-file-size don't fail the check
+
+        Returns
+        -------
+        int
+            exit code: 1 if coverage is below threshold or files failed to parse, 0 otherwise
+        """
+        if self.args.coverage_threshold is None or not self.coverage:
+            return 0
+
+        failed = sum(n for reason, n in self.parse_stats.get("skipped", {}).items() if reason != "size")
+        if failed:
+            print(f"Documentation coverage can't be checked, {failed} file(s) could not be parsed", file=sys.stderr)
+            return 1
+
+        if self.coverage["percent"] < self.args.coverage_threshold:
+            print(f"Documentation coverage {self.coverage['percent']}% is below threshold of {self.args.coverage_threshold}%", file=sys.stderr)
+            return 1
+
+        return 0
+
+
+    def combined_ast_to_list_of_files(self, combined_ast: dict, flattened: Optional[list]=None) -> list:
+        """recursively converts combined abstract syntaxt tree to flattened list of files
+
+        Parameters
+        ----------
+        node:      dict
+                   (part of) combined abstract syntax tree to process
+        flattened: list, optional
+                   holds new contents already assembled by previous recursion steps
+
+        Returns
+        -------
+        list
+            flattened list of files
+        """
+        if flattened is None:
+            flattened = []
+
+        unpacked = list(combined_ast.values())[0]
+        basename = list(combined_ast.keys())[0]
+
+        if unpacked["type"] == "file":
+            file = {"basename": basename}
+            file.update(unpacked)
+            file.update(unpacked["contents"])
+            del file["contents"]
+
+            self.parser_for(file["rel_path"]).postprocess_file(file)
+
+            flattened.append(file)
+
+        if unpacked["type"] == "directory":
+            children = unpacked["contents"].keys()
+            for c in children:
+                self.combined_ast_to_list_of_files({c: unpacked["contents"][c]}, flattened)
+
+        return flattened
+
+
+    def render_file_template(self, template_dir: str | list[str], template: str, data: dict) -> None:
         render.render_file_template(template_dir, template, data, self.args.output)
 
 
     def make_dir_tree(self, combined_ast: dict) -> str:
-        return dir_tree.make_dir_tree(combined_ast, adoc_links=self.args.adoc_links, adoc_anchors=self.args.adoc_anchors)
+        return "\n".join(self.iter_dir_tree(combined_ast))
+
+
+    def iter_dir_tree(self, combined_ast: dict) -> Iterator[str]:
+        return dir_tree.iter_dir_tree(
+            combined_ast,
+            adoc_links=self.args.adoc_links,
+            adoc_anchors=self.args.adoc_anchors,
+            max_depth=self.args.tree_max_depth,
+            max_files=self.args.tree_max_files,
+            show_counts=self.args.tree_counts
+        )
 
 
 # attach helper functions so they can be used by subclasses
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+from typing import Optional
+import hashlib
+import json
+import os
+
+
+def blob_sha(data: bytes) -> str:
+    """computes git blob object name of data, so files from disk and from git share cache keys
+
+    Parameters
+    ----------
+    data: bytes
+          file contents
+
+    Returns
+    -------
+    str
+        sha1 of git blob object (same as "git hash-object")
+    """
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class ParseCache:
+    """persistent cache of parse results keyed by blob sha
+
+    each result is stored as json file "<cache_dir>/<namespace>/<sha[:2]>/<sha[2:]>.json", the namespace separates results of different parsers and parser versions
+    """
+    def __init__(self, cache_dir: str):
+        """docs_exclude"""
+        self.path = cache_dir
+
+
+    def get(self, sha: str, namespace: str) -> Optional[dict]:
+        """returns cached parse result of blob or None if not cached
+
+        Parameters
+        ----------
+        sha:       str
+                   blob sha of parsed file
+        namespace: str
+                   name and cache version of parser
+
+        Returns
+        -------
+        dict or None
+            cached parse result
+        """
+        try:
+            with open(self.__entry_path(sha, namespace), "r") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        return result
+
+
+    def set(self, sha: str, namespace: str, result: dict) -> None:
+        """stores parse result of blob
+
+        Parameters
+        ----------
+        sha:       str
+                   blob sha of parsed file
+        namespace: str
+                   name and cache version of parser
+        result:    dict
+                   parse result (must be json serializable)
+        """
+        entry_path = self.__entry_path(sha, namespace)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        # write to temporary file first so concurrent runs never read partial entries
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp_path, entry_path)
+
+
+    def __entry_path(self, sha: str, namespace: str) -> str:
+        """docs_exclude"""
+        return os.path.join(self.path, namespace, sha[:2], f"{sha[2:]}.json")
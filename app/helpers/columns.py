@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+from typing import Optional
+
+
+def column_widths(columns: list[list[str]]) -> list[int]:
+    """computes the max width of each column of a column table
+
+    Parameters
+    ----------
+    columns: list of list of str
+             table stored column by column, all columns must have the same length
+
+    Returns
+    -------
+    list of int
+        max width of each column (0 for empty columns)
+    """
+    return [max(map(len, column), default=0) for column in columns]
+
+
+def align_columns(columns: list[list[str]], row_format: str, comments: Optional[list[Optional[str]]]=None) -> list[str]:
+    """formats all rows of a column table with aligned columns
+
+    Parameters
+    ----------
+    columns:    list of list of str
+                table stored column by column, all columns must have the same length
+    row_format: str
+                format of a single row with one "{}" placeholder per column, e.g. "    .{}()  {}"
+    comments:   list of str or None, optional
+                trailing comment of each row; appended (unaligned) after the last column if not None
+
+    Returns
+    -------
+    list of str
+        formatted rows
+    """
+    # build printf-style format with fixed column widths once and apply it to all rows in bulk
+    widths = column_widths(columns)
+    fmt = row_format.replace("%", "%%").format(*(f"%-{w}s" for w in widths))
+    lines = list(map(fmt.__mod__, zip(*columns)))
+
+    if comments is None:
+        return lines
+
+    return [line + "  " + c if c else line for line, c in zip(lines, comments)]
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import csv
+import json
+
+
+def coverage_percent(coverage: dict) -> float:
+    """computes documentation coverage in percent
+
+    Parameters
+    ----------
+    coverage: dict
+              counters "documented" and "total"
+
+    Returns
+    -------
+    float
+        percentage of documented elements (100.0 if there is nothing to document)
+    """
+    if not coverage or coverage["total"] == 0:
+        return 100.0
+
+    return round(100 * coverage["documented"] / coverage["total"], 2)
+
+
+def coverage_rows(combined_ast: dict) -> list[dict]:
+    """collects coverage counters of all directories and files of the combined abstract syntax tree
+
+    Parameters
+    ----------
+    combined_ast: dict
+                  abstract syntax tree generated by Parser class (with coverage counters added by add_file_idx)
+
+    Returns
+    -------
+    list of dict
+        type, rel_path, documented, total and percent of each directory and file (depth-first order)
+    """
+    rows = []
+    if combined_ast is None:
+        return rows
+
+    stack = [next(iter(combined_ast.values()))]
+    while stack:
+        node = stack.pop()
+        coverage = node.get("coverage") or {"documented": 0, "total": 0}
+        rows.append({
+            "type": node["type"],
+            "rel_path": node["rel_path"],
+            "documented": coverage["documented"],
+            "total": coverage["total"],
+            "percent": coverage_percent(coverage)
+        })
+
+        if node["type"] == "directory":
+            stack.extend(reversed(list(node["contents"].values())))
+
+    return rows
+
+
+def write_report(outfile: str, combined_ast: dict) -> None:
+    """writes documentation coverage report as csv (if outfile ends with ".csv") or json
+
+    Parameters
+    ----------
+    outfile:      str
+                  filename and path of report
+    combined_ast: dict
+                  abstract syntax tree generated by Parser class (with coverage counters added by add_file_idx)
+    """
+    rows = coverage_rows(combined_ast)
+
+    if outfile.endswith(".csv"):
+        with open(outfile, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["type", "rel_path", "documented", "total", "percent"])
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(outfile, "w") as f:
+            json.dump({
+                "overall": rows[0] if rows else None,
+                "directories": [r for r in rows if r["type"] == "directory"],
+                "files": [r for r in rows if r["type"] == "file"]
+            }, f, indent=2)
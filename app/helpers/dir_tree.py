@@ -1,39 +1,62 @@
 #!/usr/bin/env python3
 
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
 from .misc import matches_any_regex
 
 
-def make_dir_tree(
+def make_dir_tree(combined_ast: dict, **kwargs) -> str:
+    """converts abstract syntax tree to tree-like output
+
+    Parameters
+    ----------
+    combined_ast: dict
+                  abstract syntax tree generated by Parser class
+    kwargs:       see iter_dir_tree
+
+    Returns
+    -------
+    str
+        tree-like output generated from ast
+    """
+    return "\n".join(iter_dir_tree(combined_ast, **kwargs))
+
+
+def iter_dir_tree(
         combined_ast: dict,
         last: bool=True,
         header: str='',
-        lines: Optional[list[str]]=None,
         adoc_links: bool=False,
-        adoc_anchors: bool=False
-    ) -> str:
-    """converts abstract syntax tree to tree-like output
+        adoc_anchors: bool=False,
+        max_depth: Optional[int]=None,
+        max_files: Optional[int]=None,
+        show_counts: bool=False
+    ) -> Iterator[str]:
+    """lazily converts abstract syntax tree to tree-like output, one line at a time
 
     Parameters
     ----------
     combined_ast: dict
                   abstract syntax tree generated by Parser class
     last:         bool, default=True
-                  used in recursion; set True if node is last node in a branch
+                  set True if root node is last node in a branch
     header:       str, default=""
-                  used in recursion; contains tree symbols preceeding the current line of the output
-    lines:        list of str, optional
-                  used in recursion; holds the previously generated lines of output
+                  tree symbols preceeding each line of the output
     adoc_links:   bool, default=False
                   if True, adds adoc compatible relative links to each file in the tree
     adoc_anchors: bool, default=False
                   if True, adds adoc compatible links to anchors for use in the same adoc document
-
-    Returns
-    -------
+    max_depth:    int, optional
+                  contents of directories deeper than max_depth (root: 0) are collapsed into a summary line
+    max_files:    int, optional
+                  files of directories directly containing more than max_files files are collapsed into a summary line
+    show_counts:  bool, default=False
+                  if True, adds aggregate counts (files, functions, ...) to each directory; requires counts added by add_file_idx
+
+    Yields
+    ------
     str
-        tree-like output generated from ast
+        lines of tree-like output generated from ast
     """
 
     elbow = "└── "
@@ -42,43 +65,99 @@ def make_dir_tree(
     blank = "    "
 
     if combined_ast is None:
-        return ""
+        return
 
-    if lines is None:
-        lines = []
+    # explicit stack instead of recursion so deep trees neither hit the recursion limit nor need all lines in memory
+    stack = [(next(iter(combined_ast.items())), header, last, 0)]
 
-    unpacked = list(combined_ast.values())[0]
-    basename = list(combined_ast.keys())[0]
-    if adoc_links:
-        if adoc_anchors and unpacked["type"] == "file":
-            lines.append(f"{header}{(elbow if last else tee)}link:{unpacked["rel_path"]}[{basename}] (<<src-{unpacked["file_idx"]},details>>)")
+    while stack:
+        (basename, unpacked), header, last, depth = stack.pop()
+
+        if unpacked["type"] == "summary":
+            yield f"{header}{(elbow if last else tee)}… {_format_counts(unpacked['counts'])}"
+            continue
+
+        line = f"{header}{(elbow if last else tee)}"
+        if adoc_links:
+            line += f"link:{unpacked['rel_path']}[{basename}]"
         else:
-            lines.append(f"{header}{(elbow if last else tee)}link:{unpacked["rel_path"]}[{basename}]")
-    else:
+            line += basename
+
         if adoc_anchors and unpacked["type"] == "file":
-            lines.append(f"{header}{(elbow if last else tee)}{basename} (<<src-{unpacked["file_idx"]},details>>)")
-        else:
-            lines.append(f"{header}{(elbow if last else tee)}{basename}")
+            line += f" (<<src-{unpacked['file_idx']},details>>)"
+        elif show_counts and unpacked["type"] == "directory" and "counts" in unpacked:
+            line += f" ({_format_counts(unpacked['counts'])})"
+
+        yield line
+
+        if unpacked["type"] == "directory":
+            children = list(unpacked["contents"].items())
+
+            if max_depth is not None and depth > max_depth and children:
+                # collapse whole directory
+                children = [("", {"type": "summary", "counts": unpacked.get("counts") or _count_files(unpacked)})]
+            elif max_files is not None:
+                files = [c for c in children if c[1]["type"] == "file"]
+                if len(files) > max_files:
+                    # keep subdirectories, collapse files
+                    children = [c for c in children if c[1]["type"] != "file"]
+                    children.append(("", {"type": "summary", "counts": _sum_counts(count_file(f[1]) for f in files)}))
+
+            child_header = header + (blank if last else pipe)
+            for i in range(len(children) - 1, -1, -1):
+                stack.append((children[i], child_header, i == len(children) - 1, depth + 1))
+
+
+def count_file(node: dict) -> dict[str, int]:
+    """counts file and its top-level elements (e.g. functions, classes or modules)
+
+    Parameters
+    ----------
+    node: dict
+          file node of combined abstract syntax tree
+
+    Returns
+    -------
+    dict
+        {"files": 1} and the number of elements of each list in the file contents
+    """
+    counts = {"files": 1}
+    for key, value in (node.get("contents") or {}).items():
+        # the common element list repeats the language specific lists
+        if key != "elements" and isinstance(value, (list, tuple)):
+            counts[key] = len(value)
+
+    return counts
+
+
+def _sum_counts(counts: Iterable[dict[str, int]]) -> dict[str, int]:
+    """docs_exclude"""
+    total = {}
+    for c in counts:
+        for key, value in c.items():
+            total[key] = total.get(key, 0) + value
+
+    return total
+
+
+def _count_files(node: dict) -> dict[str, int]:
+    """docs_exclude"""
+    # fallback if counts were not added by add_file_idx
+    if node["type"] == "file":
+        return count_file(node)
+
+    return _sum_counts(_count_files(child) for child in node["contents"].values())
 
-    if unpacked["type"] == "directory":
-        children = unpacked["contents"].keys()
-        for i, c in enumerate(children):
-            make_dir_tree(
-                {f"{c}": unpacked["contents"][c]},
-                header=header + (blank if last else pipe),
-                last=i == len(children) - 1,
-                lines=lines,
-                adoc_links=adoc_links,
-                adoc_anchors=adoc_anchors
-            )
 
-    return "\n".join(lines)
+def _format_counts(counts: dict[str, int]) -> str:
+    """docs_exclude"""
+    return ", ".join(f"{value:,} {key}" for key, value in counts.items())
 
 
 file_idx = 0
 
 def add_file_idx(node: dict) -> dict:
-    """recursively goes through node and adds unique idx to each file
+    """recursively goes through node and adds unique idx to each file and aggregate counts (see count_file) and coverage counters to each directory
 
     Parameters
     ----------
@@ -101,9 +180,13 @@ def add_file_idx(node: dict) -> dict:
         return {basename: unpacked}
 
     new_contents = {}
+    child_counts = []
+    child_coverage = []
     for name, child in unpacked["contents"].items():
         res = add_file_idx({name: child})
         new_contents[name] = list(res.values())[0]
+        child_counts.append(new_contents[name]["counts"] if new_contents[name]["type"] == "directory" else count_file(new_contents[name]))
+        child_coverage.append(new_contents[name].get("coverage") or {"documented": 0, "total": 0})
 
     # Return the directory with modified contents
     return {
@@ -111,6 +194,8 @@ def add_file_idx(node: dict) -> dict:
             "type": "directory",
             "contents": new_contents,
             "rel_path": unpacked["rel_path"],
+            "counts": _sum_counts(child_counts),
+            "coverage": _sum_counts(child_coverage),
         }
     }
 
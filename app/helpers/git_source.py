@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+import subprocess
+
+
+class GitSource:
+    """reads file tree and blobs of a local git repository at a given revision without checking it out
+
+    blobs are read through a single long-lived "git cat-file --batch" process
+    """
+    def __init__(self, path: str, revision: str):
+        """docs_exclude"""
+        self.path = path
+        self.revision = revision
+        self.__cat_file = None
+
+
+    def list_files(self) -> list[tuple[str, str, int]]:
+        """lists all files below path at revision
+
+        Returns
+        -------
+        list of tuple of str, str and int
+            path (relative to path), blob sha and size in bytes of each file
+        """
+        # paths printed by ls-tree are relative to the working directory of the command (-C path)
+        try:
+            output = subprocess.run(
+                ["git", "-C", self.path, "ls-tree", "-r", "-l", "-z", self.revision],
+                check=True,
+                capture_output=True
+            ).stdout.decode("utf-8", errors="surrogateescape")
+        except subprocess.CalledProcessError as e:
+            # e.g. unknown revision or path outside of a git repository
+            raise RuntimeError(f"could not list files of revision '{self.revision}' in {self.path}: {e.stderr.decode(errors='replace').strip()}") from None
+
+        files = []
+        for entry in output.split("\0"):
+            if not entry:
+                continue
+
+            info, rel_path = entry.split("\t", 1)
+            mode, obj_type, sha, size = info.split()
+
+            # skip submodules (type commit) and symlinks (mode 120000)
+            if obj_type != "blob" or mode == "120000":
+                continue
+
+            files.append((rel_path, sha, int(size)))
+
+        return files
+
+
+    def read_blob(self, sha: str) -> str:
+        """reads contents of blob
+
+        Parameters
+        ----------
+        sha: str
+             object name of blob
+
+        Returns
+        -------
+        str
+            decoded contents of blob
+        """
+        if self.__cat_file is None:
+            self.__cat_file = subprocess.Popen(
+                ["git", "-C", self.path, "cat-file", "--batch"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE
+            )
+
+        self.__cat_file.stdin.write(f"{sha}\n".encode())
+        self.__cat_file.stdin.flush()
+
+        # response: "<sha> <type> <size>\n<contents>\n" or "<sha> missing\n"
+        header = self.__cat_file.stdout.readline().decode().split()
+        if len(header) != 3:
+            raise FileNotFoundError(f"git object {sha} not found in {self.path}")
+
+        contents = self.__cat_file.stdout.read(int(header[2]))
+        self.__cat_file.stdout.read(1)
+
+        return contents.decode("utf-8", errors="replace")
+
+
+    def close(self) -> None:
+        """terminates cat-file process if running"""
+        if self.__cat_file is not None:
+            self.__cat_file.stdin.close()
+            self.__cat_file.wait()
+            self.__cat_file = None
+
+
+    def __enter__(self):
+        """docs_exclude"""
+        return self
+
+
+    def __exit__(self, *exc):
+        """docs_exclude"""
+        self.close()
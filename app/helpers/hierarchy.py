@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+from typing import Iterable
+
+
+def build_instance_graph(modules: Iterable[dict]) -> dict[str, dict[str, int]]:
+    """builds adjacency index of module instantiations
+
+    Parameters
+    ----------
+    modules: iterable of dict
+             module definitions with keys "name" and "instances" (list of dicts with key "module")
+
+    Returns
+    -------
+    dict
+        maps each defined module to a dict of instantiated modules and their number of instances
+    """
+    graph = {}
+
+    for module in modules:
+        children = graph.setdefault(module["name"], {})
+        for instance in module.get("instances") or []:
+            children[instance["module"]] = children.get(instance["module"], 0) + 1
+
+    return graph
+
+
+def find_top_modules(graph: dict[str, dict[str, int]]) -> list[str]:
+    """finds defined modules that are not instantiated by any other module
+
+    Parameters
+    ----------
+    graph: dict
+           instantiation graph generated by build_instance_graph
+
+    Returns
+    -------
+    list of str
+        names of top-level modules (in order of definition)
+    """
+    instantiated = set()
+    for children in graph.values():
+        instantiated.update(children)
+
+    return [name for name in graph if name not in instantiated]
+
+
+def find_cycles(graph: dict[str, dict[str, int]]) -> list[list[str]]:
+    """finds cyclic instantiations using (iterative) Tarjan's strongly connected components algorithm
+
+    Parameters
+    ----------
+    graph: dict
+           instantiation graph generated by build_instance_graph
+
+    Returns
+    -------
+    list of list of str
+        modules of each cycle (strongly connected component with more than one module or a self-instantiation)
+    """
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    cycles = []
+
+    for root in graph:
+        if root in index:
+            continue
+
+        # each work item holds a node and an iterator over its remaining children
+        work = [(root, iter(graph[root]))]
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+
+        while work:
+            node, children = work[-1]
+            descended = False
+
+            for child in children:
+                if child not in graph:
+                    # instantiated module is not defined in any parsed file
+                    continue
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(graph[child])))
+                    descended = True
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+
+            if descended:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.remove(member)
+                    component.append(member)
+                    if member == node:
+                        break
+
+                if len(component) > 1 or node in graph[node]:
+                    cycles.append(component[::-1])
+
+    return cycles
+
+
+def make_hierarchy_tree(graph: dict[str, dict[str, int]], top_modules: list[str]) -> str:
+    """converts instantiation graph to tree-like output starting at the given top-level modules
+
+    each module is only expanded once; further occurrences are marked with "(see above)" to keep output linear in the number of edges
+
+    Parameters
+    ----------
+    graph:       dict
+                 instantiation graph generated by build_instance_graph
+    top_modules: list of str
+                 root modules of the tree
+
+    Returns
+    -------
+    str
+        tree-like output of design hierarchy
+    """
+    elbow = "└── "
+    pipe = "│   "
+    tee = "├── "
+    blank = "    "
+
+    lines = []
+    expanded = set()
+
+    # explicit stack instead of recursion as hierarchies of generated designs can be very deep
+    stack = [(name, 1, "", i == len(top_modules) - 1) for i, name in reversed(list(enumerate(top_modules)))]
+
+    while stack:
+        name, count, header, last = stack.pop()
+
+        line = f"{header}{(elbow if last else tee)}{name}"
+        if count > 1:
+            line += f" (x{count})"
+
+        children = graph.get(name)
+        if children and name in expanded:
+            lines.append(f"{line} (see above)")
+            continue
+
+        lines.append(line)
+        expanded.add(name)
+
+        if children:
+            child_header = header + (blank if last else pipe)
+            items = list(children.items())
+            for i in range(len(items) - 1, -1, -1):
+                stack.append((items[i][0], items[i][1], child_header, i == len(items) - 1))
+
+    return "\n".join(lines)
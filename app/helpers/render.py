@@ -5,13 +5,13 @@ from datetime import datetime
 from tzlocal import get_localzone
 
 
-def render_file_template(templates_dir: str, template: str, data: dict, outfile: str) -> None:
+def render_file_template(templates_dir: str | list[str], template: str, data: dict, outfile: str) -> None:
     """renders provided jinja2 file template with given data
 
     Parameters
     ----------
-    templates_dir: str
-                   search path for jinja2 templates
+    templates_dir: str or list of str
+                   search path(s) for jinja2 templates
     template:      str
                    filename of template
     data:          dict
@@ -19,6 +19,29 @@ def render_file_template(templates_dir: str, template: str, data: dict, outfile:
     outfile:       str
                    filename and path of output
     """
+    output = render_template(templates_dir, template, data)
+
+    with open(outfile, "w") as f:
+        f.write(output)
+
+
+def render_template(templates_dir: str | list[str], template: str, data: dict) -> str:
+    """renders provided jinja2 template with given data to str
+
+    Parameters
+    ----------
+    templates_dir: str or list of str
+                   search path(s) for jinja2 templates
+    template:      str
+                   filename of template
+    data:          dict
+                   template variables
+
+    Returns
+    -------
+    str
+        rendered template
+    """
     env = Environment(
         loader=FileSystemLoader(templates_dir),
         trim_blocks=True,
@@ -29,7 +52,4 @@ def render_file_template(templates_dir: str, template: str, data: dict, outfile:
      # make 'now' available in jinja templates
     template.globals["now"] = datetime.now(get_localzone()).strftime('%d.%m.%Y %H:%M:%S %z')
 
-    output = template.render(**data)
-
-    with open(outfile, "w") as f:
-        f.write(output)
+    return template.render(**data)
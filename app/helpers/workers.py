@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Any, Callable, Iterable, Iterator, Optional
+import multiprocessing
+import time
+
+try:
+    import resource
+except ImportError:
+    # not available on windows, memory limits are not enforced there
+    resource = None
+
+
+def _worker_main(conn, func: Callable, max_memory: Optional[int]) -> None:
+    """docs_exclude"""
+    if max_memory is not None and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory, max_memory))
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+
+        if task is None:
+            return
+
+        try:
+            conn.send(("ok", func(*task)))
+        except MemoryError:
+            conn.send(("memory", "memory limit exceeded"))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class SupervisedPool:
+    """runs tasks in worker processes which are killed and replaced when a task exceeds the timeout or the worker crashes
+
+    workers are forked (if supported by the platform) so func does not need to be picklable
+    """
+    def __init__(self, func: Callable, num_workers: int=1, timeout: Optional[float]=None, max_memory: Optional[int]=None):
+        """docs_exclude"""
+        self.func = func
+        self.num_workers = max(1, num_workers)
+        self.timeout = timeout
+        self.max_memory = max_memory
+
+        if "fork" in multiprocessing.get_all_start_methods():
+            self.__context = multiprocessing.get_context("fork")
+        else:
+            self.__context = multiprocessing.get_context()
+
+
+    def run(self, tasks: Iterable[tuple]) -> Iterator[tuple[int, str, Any]]:
+        """runs func for all tasks; tasks are consumed lazily
+
+        Parameters
+        ----------
+        tasks: iterable of tuple
+               arguments of func for each task
+
+        Yields
+        ------
+        tuple of int, str and any
+            index of task, status ("ok", "timeout", "memory", "error" or "crashed") and result of func or error message
+        """
+        pending = iter(enumerate(tasks))
+        idle = deque()
+        busy = {}  # conn -> (process, task index, deadline)
+
+        try:
+            while True:
+                # hand out tasks to idle workers (new workers are only started while there are tasks left)
+                while len(busy) < self.num_workers:
+                    next_task = next(pending, None)
+                    if next_task is None:
+                        break
+
+                    process, conn = idle.popleft() if idle else self.__spawn()
+                    conn.send(next_task[1])
+                    deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+                    busy[conn] = (process, next_task[0], deadline)
+
+                if not busy:
+                    return
+
+                deadlines = [d for _, _, d in busy.values() if d is not None]
+                wait_timeout = max(0, min(deadlines) - time.monotonic()) if deadlines else None
+
+                for conn in wait(list(busy), timeout=wait_timeout):
+                    process, idx, _ = busy.pop(conn)
+                    try:
+                        status, value = conn.recv()
+                        idle.append((process, conn))
+                    except EOFError:
+                        # worker died (e.g. killed by the OOM killer or a segfault); a new one is started for the next task
+                        process.join()
+                        status, value = "crashed", f"worker exited with code {process.exitcode}"
+                        conn.close()
+                    yield idx, status, value
+
+                now = time.monotonic()
+                for conn, (process, idx, deadline) in list(busy.items()):
+                    if deadline is not None and now >= deadline:
+                        del busy[conn]
+                        process.kill()
+                        process.join()
+                        conn.close()
+                        yield idx, "timeout", f"exceeded timeout of {self.timeout}s"
+
+        finally:
+            for process, conn in idle:
+                try:
+                    conn.send(None)
+                except OSError:
+                    pass
+                process.join()
+                conn.close()
+
+            for conn, (process, _, _) in busy.items():
+                process.kill()
+                process.join()
+                conn.close()
+
+
+    def __spawn(self) -> tuple:
+        """docs_exclude"""
+        parent_conn, child_conn = self.__context.Pipe()
+        process = self.__context.Process(target=_worker_main, args=(child_conn, self.func, self.max_memory), daemon=True)
+        process.start()
+        child_conn.close()
+        return process, parent_conn
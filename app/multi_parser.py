@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+
+from docs_parser import Parser
+from helpers import render
+from parser_registry import ParserRegistry
+
+
+class MultiParser(Parser):
+    """dispatches files to the registered parsers (see parser_registry) by file extension and renders all languages in one document
+
+    all files share the same scan, cache and worker pool; each language's details are rendered with its parser's files_template
+    """
+    def __init__(self):
+        """docs_exclude"""
+        self.registry = ParserRegistry()
+        self.parsers = {}
+        self.__extensions = []
+
+        super().__init__()
+
+        for language in self.__languages:
+            self.parsers[language] = self.registry.load(language)(args=self.args)
+
+        # longest extensions first, so e.g. ".d.ts" takes precedence over ".ts"
+        self.__extensions = sorted(
+            ((ext, parser) for parser in self.parsers.values() for ext in parser.target_file_extensions),
+            key=lambda e: len(e[0]),
+            reverse=True
+        )
+
+
+    @property
+    def target_file_extensions(self):
+        # union of extensions of all enabled parsers
+        return [ext for ext, _ in self.__extensions]
+
+
+    def parser_for(self, path: str) -> Parser:
+        for ext, parser in self.__extensions:
+            if path.endswith(ext):
+                return parser
+
+        return self
+
+
+    def parse_file(self, full_path: str) -> dict:
+        """dispatches file to the parser responsible for its extension
+
+        Parameters
+        ----------
+        full_path: str
+                   absolute path to target file
+
+        Returns
+        -------
+        dict
+            result of parse_file of the responsible parser
+        """
+        # source is read here so the parsers don't need to know whether it comes from disk, git or the main process
+        return self.parser_for(full_path).parse_source(full_path, self.read_source(full_path))
+
+
+    def template_data(self, list_of_files: list) -> dict:
+        sections = []
+        for language, parser in self.parsers.items():
+            files = [f for f in list_of_files if self.parser_for(f["rel_path"]) is parser]
+            if not files:
+                continue
+
+            # file sections are nested in the section of their language
+            data = {"list_of_files": files, "heading_level": 3}
+            data.update(parser.template_data(files))
+            sections.append({
+                "language": language,
+                "title": parser.title or language,
+                "content": render.render_template(self.__template_dirs(), parser.files_template, data)
+            })
+
+        return {"sections": sections}
+
+
+    def create_arg_parser(self):
+        # parsers of languages that are not enabled are never imported
+        pre_parser = argparse.ArgumentParser(add_help=False)
+        pre_parser.add_argument("--languages", nargs="*", default=None)
+        self.__languages = pre_parser.parse_known_args()[0].languages or self.registry.languages()
+
+        parser = super().create_arg_parser()
+        parser.set_defaults(template="docs.adoc")
+
+        language_opts = parser.add_argument_group('Language Options')
+        language_opts.add_argument("--languages", nargs="*", choices=self.registry.languages(), default=None, help="languages to document (default: all registered)")
+
+        for language in self.__languages:
+            if language in self.registry.languages():
+                self.registry.load(language).add_arguments(parser)
+
+        return parser
+
+
+    def render_file_template(self, template_dir: str, template: str, data: dict) -> None:
+        super().render_file_template(self.__template_dirs(), template, data)
+
+
+    def __template_dirs(self) -> list[str]:
+        """docs_exclude"""
+        return [self.args.template_dir] + [p.template_dir for p in self.parsers.values() if p.template_dir]
+
+
+if __name__ == "__main__":
+    multi_parser = MultiParser()
+    multi_parser.make_docs()
+    print("Done.")
+    sys.exit(multi_parser.check_coverage())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+from importlib import import_module
+from importlib.metadata import entry_points
+
+from docs_parser import Parser
+
+
+# third-party packages register parsers as "<language> = <module>:<Parser subclass>" in this entry point group
+ENTRY_POINT_GROUP = "docs_tools.parsers"
+
+BUILTIN_PARSERS = {
+    "python": "py_parser:PythonParser",
+    "systemverilog": "sv_parser:SystemVerilogParser",
+}
+
+
+class ParserRegistry:
+    """registry of available parsers (built-in and discovered through package entry points)
+
+    parser classes are only imported when they are loaded for the first time
+    """
+    def __init__(self):
+        """docs_exclude"""
+        self.__specs = dict(BUILTIN_PARSERS)
+        for ep in entry_points(group=ENTRY_POINT_GROUP):
+            # built-in parsers can't be replaced
+            self.__specs.setdefault(ep.name, ep)
+
+        self.__loaded = {}
+
+
+    def languages(self) -> list[str]:
+        """names of all registered languages
+
+        Returns
+        -------
+        list of str
+            registered languages (built-in first)
+        """
+        return list(self.__specs)
+
+
+    def load(self, language: str) -> type[Parser]:
+        """imports parser class of language
+
+        Parameters
+        ----------
+        language: str
+                  name of registered language
+
+        Returns
+        -------
+        type
+            subclass of Parser (with files_template and language set)
+        """
+        if language not in self.__loaded:
+            spec = self.__specs[language]
+
+            if isinstance(spec, str):
+                module_name, class_name = spec.split(":")
+                parser_class = getattr(import_module(module_name), class_name)
+            else:
+                parser_class = spec.load()
+
+            if not isinstance(parser_class, type) or not issubclass(parser_class, Parser):
+                raise TypeError(f"parser registered for '{language}' must be a subclass of Parser")
+
+            if parser_class.files_template is None:
+                raise TypeError(f"parser registered for '{language}' must set files_template")
+
+            # the language of a parser is the name it is registered under
+            if parser_class.language is None:
+                parser_class.language = language
+            elif parser_class.language != language:
+                raise TypeError(f"parser registered for '{language}' has language '{parser_class.language}'")
+
+            self.__loaded[language] = parser_class
+
+        return self.__loaded[language]
@@ -1,18 +1,35 @@
 #/usr/bin/env python3
 
 import ast
-from typing import Optional
+import sys
+import regex
 
 from docs_parser import Parser
 
 
 class PythonParser(Parser):
+    """parses python files for function and class signatures and docstrings
+
+    add EXCLUDE_KEYWORD to each docstring of each function / method or class you want to exclude from the documentation output
+    """
+    language = "python"
+    title = "Python Functions and Classes"
+    files_template = "python_files.adoc"
+
+    DUNDER_REGEX = regex.compile(r"^__\w+__$")
+    # spelled out here only, a docstring containing the keyword itself would be excluded
+    EXCLUDE_KEYWORD = "docs_exclude"
+
     @property
     def target_file_extensions(self):
         # targeting python files
         return [".py"]
 
 
+    def empty_result(self) -> dict:
+        return {**super().empty_result(), "functions": (), "classes": ()}
+
+
     def parse_file(self, full_path: str) -> dict:
         """parses specified python file for signatures and docstrings of classes and functions
 
@@ -24,22 +41,24 @@ class PythonParser(Parser):
         Returns
         -------
         dict
-            signatures and docstrings of parsed functions and classes
+            signatures and docstrings of parsed functions and classes (excluding elements whose docstring contains EXCLUDE_KEYWORD)
         """
-        with open(full_path, "r") as f:
-            source = f.read()
+        source = self.read_source(full_path)
 
         try:
             tree = ast.parse(source)
         except SyntaxError:
-            return {"functions": [], "classes": []}
+            return self.empty_result()
+
+        # split once per file (line breaks as counted by ast), ast.get_source_segment would split the source again for every node
+        source_lines = regex.split(r"\r\n|\r|\n", source)
 
         functions = []
         classes = []
 
         for node in tree.body:
             if isinstance(node, ast.FunctionDef):
-                signature, decorators = self.__get_signature_and_decorators(source, node)
+                signature, decorators = self.__get_signature_and_decorators(source_lines, node)
 
                 sig = {
                     "name": node.name,
@@ -56,7 +75,7 @@ class PythonParser(Parser):
             elif isinstance(node, ast.ClassDef):
                 bases = [ast.unparse(base) if hasattr(ast, "unparse") else getattr(base, "id", str(base)) for base in node.bases]
 
-                signature, decorators = self.__get_signature_and_decorators(source, node)
+                signature, decorators = self.__get_signature_and_decorators(source_lines, node)
 
                 class_info = {
                     "name": node.name,
@@ -71,7 +90,7 @@ class PythonParser(Parser):
 
                 for child in node.body:
                     if isinstance(child, ast.FunctionDef):
-                        method_signature, method_decorators = self.__get_signature_and_decorators(source, child)
+                        method_signature, method_decorators = self.__get_signature_and_decorators(source_lines, child)
                         method_info = {
                             "name": child.name,
                             "lineno_start": child.lineno,
@@ -84,18 +103,51 @@ class PythonParser(Parser):
                         }
                         class_info["methods"].append(method_info)
 
+                class_info["methods"] = self.__filter_elements(class_info["methods"])
                 classes.append(class_info)
 
-        return {"functions": functions, "classes": classes}
+        functions = self.__filter_elements(functions)
+        classes = self.__filter_elements(classes)
+
+        # common element list (see Parser.ELEMENT_KEYS), also used for the documentation coverage
+        elements = [self.__make_element(f, "function") for f in functions]
+        for cls in classes:
+            elements.append(self.__make_element(cls, "class"))
+            elements.extend(self.__make_element(m, "method") for m in cls["methods"])
+
+        return {"elements": elements, "functions": functions, "classes": classes}
+
+
+    def __make_element(self, elem: dict, kind: str) -> dict:
+        """docs_exclude"""
+        return {"name": elem["name"], "kind": kind, "docstring": elem["docstring"], "lineno_start": elem["lineno_start"], "lineno_end": elem["lineno_end"]}
 
 
-    def __get_signature_and_decorators(self, source, node):
+    def __filter_elements(self, elements: list[dict]) -> tuple[dict, ...]:
         """docs_exclude"""
-        # get full signature as written in the code
-        code_segment = ast.get_source_segment(source, node)
+        # applied once at parse time (result is cached with the parse result), so names are never escaped twice
+        filtered = tuple(e for e in elements if e["docstring"] is None or self.EXCLUDE_KEYWORD not in e["docstring"])
+
+        for elem in filtered:
+            if self.DUNDER_REGEX.match(elem["name"]):
+                # excape double underscore for AsciiDoc
+                elem["name"] = f"\\\\{elem['name']}"
+
+        return filtered
+
+
+    def __get_signature_and_decorators(self, source_lines, node):
+        """docs_exclude"""
+        # get full signature as written in the code (col offsets are utf-8 byte offsets)
         signature_lines = []
 
-        for line in code_segment.splitlines():
+        for lineno in range(node.lineno - 1, node.end_lineno):
+            line = source_lines[lineno]
+            if lineno == node.lineno - 1 or lineno == node.end_lineno - 1:
+                start = node.col_offset if lineno == node.lineno - 1 else 0
+                end = node.end_col_offset if lineno == node.end_lineno - 1 else None
+                line = line.encode()[start:end].decode()
+
             line_wo_comment = line.split("#", 1)[0].rstrip() # remove inline comments
             signature_lines.append(line)
             if line_wo_comment.endswith(":"):
@@ -115,90 +167,14 @@ class PythonParser(Parser):
         return full_signature, decorators
 
 
-    def make_docs(self):
-        """parses python files for function and class signatures and docstrings and generates AsciiDoc documentation from them
-
-        add keyword 'docs_exclude' to each docstring of each function / method or class you want to exclude from the documentation output
-        """
-        combined_ast = self.get_combined_ast()
-
-        dir_tree_str = self.make_dir_tree(combined_ast)
-        list_of_files = self.combined_ast_to_list_of_files(combined_ast)
-
-        if self.args.output == None:
-            print(dir_tree_str)
-        else:
-            data = {
-                "dir_tree": dir_tree_str,
-                "list_of_files": list_of_files
-            }
-            self.render_file_template(self.args.template_dir, self.args.template, data)
-
-
     def create_arg_parser(self):
         parser = super().create_arg_parser()
         parser.set_defaults(template="python.adoc")
         return parser
 
 
-    def combined_ast_to_list_of_files(self, combined_ast: dict, flattened: Optional[list]=None) -> list:
-        """recursively converts combined abstract syntaxt tree to flattened list of files
-
-        Parameters
-        ----------
-        node:      dict
-                   (part of) combined abstract syntax tree to process
-        flattened: list, optional
-                   holds new contents already assembled by previous recursion steps
-
-        Returns
-        -------
-        list
-            flattened list of files
-        """
-        if flattened is None:
-            flattened = []
-
-        unpacked = list(combined_ast.values())[0]
-        basename = list(combined_ast.keys())[0]
-
-        if unpacked["type"] == "file":
-            file = {"basename": basename}
-            file.update(unpacked)
-            file.update(unpacked["contents"])
-            del file["contents"]
-
-            for k in ["functions", "classes"]:
-                for elem in file[k][:]:
-                    # iterate over copy of list to avoid skipping elements when removing one
-                    if elem["docstring"] != None and self.matches_any_regex(elem["docstring"], ["docs_exclude"]):
-                        file[k].remove(elem)
-
-                    if self.matches_any_regex(elem["name"], ["^__\\w+__$"]):
-                        # excape double underscore for AsciiDoc
-                        elem["name"] = f"\\\\{elem['name']}"
-
-                    if k == "classes":
-                        for method in elem["methods"][:]:
-                            # iterate over copy of list to avoid skipping elements when removing one
-                            if method["docstring"] != None and self.matches_any_regex(method["docstring"], ["docs_exclude"]):
-                                elem["methods"].remove(method)
-
-                            if self.matches_any_regex(method["name"], ["^__\\w+__$"]):
-                                # excape double underscore for AsciiDoc
-                                method["name"] = f"\\\\{method['name']}"
-
-            flattened.append(file)
-
-        if unpacked["type"] == "directory":
-            children = unpacked["contents"].keys()
-            for c in children:
-                self.combined_ast_to_list_of_files({c: unpacked["contents"][c]}, flattened)
-
-        return flattened
-
-
 if __name__ == "__main__":
     python_parser = PythonParser()
     python_parser.make_docs()
     print("Done.")
+    sys.exit(python_parser.check_coverage())
@@ -1,18 +1,50 @@
 #/usr/bin/env python3
 
+from operator import itemgetter
 from typing import Optional
 import regex
+import sys
 
 from docs_parser import Parser
+from helpers import hierarchy
+from helpers.columns import align_columns
 
 
 class SystemVerilogParser(Parser):
+    """parses systemverilog files for modules and docs_description comments
+
+    inline comments or comment blocks starting with keyword 'docs_description' are included in the documentation
+    """
+    language = "systemverilog"
+    title = "SystemVerilog Modules"
+    files_template = "systemverilog_files.adoc"
+
+    INSTANCE_STYLES = ["named", "directions", "wildcard"]
+
+    # keywords and gate primitives that can precede "<identifier> (" without being a module instantiation
+    SV_KEYWORDS = {
+        "always", "always_comb", "always_ff", "always_latch", "and", "assert", "assign", "assume", "begin", "bit", "buf",
+        "byte", "case", "casex", "casez", "cover", "else", "end", "final", "for", "foreach", "forever", "function", "generate",
+        "genvar", "if", "initial", "inout", "input", "int", "integer", "localparam", "logic", "module", "nand", "nor", "not",
+        "or", "output", "parameter", "property", "reg", "repeat", "return", "sequence", "task", "typedef", "while", "wire",
+        "xnor", "xor"
+    }
+
     @property
     def target_file_extensions(self):
         # targeting systemverilog files
         return [".sv"]
 
 
+    def empty_result(self) -> dict:
+        return {**super().empty_result(), "modules": [], "docs": None}
+
+
+    def count_documentation(self, contents: dict) -> tuple[int, int]:
+        # docs_description comments are collected per file
+        return int(contents["docs"] is not None), 1
+
+
     def parse_file(self, full_path: str) -> dict:
         """parses specified systemverilog file for modules and docs_description comments
 
@@ -26,8 +58,7 @@ class SystemVerilogParser(Parser):
         dict
             module definitions and docs_description comments of parsed file
         """
-        with open(full_path, "r") as f:
-             source = f.read()
+        source = self.read_source(full_path)
 
         modules_list = []
 
@@ -40,30 +71,40 @@ class SystemVerilogParser(Parser):
         else:
             comments = "\n".join(comments)
 
-        # extract all module definitions from file
-        modules = regex.findall(r"module[\s\S]*?endmodule", source)
+        elements = []
+        lineno, pos = 1, 0
 
-        for module in modules:
+        # extract all module definitions from file
+        for module_match in regex.finditer(r"module[\s\S]*?endmodule", source):
+            module = module_match.group()
             mod_dict = {}
 
-            # extract header section of module
-            header = regex.search(r"(module(?:.|\n)*\);)", module).groups()[0]
+            # line numbers are counted from the end of the previous module, counting from the start of the file would be quadratic
+            lineno_start = lineno + source.count("\n", pos, module_match.start())
+            lineno, pos = lineno_start + module.count("\n"), module_match.end()
+
+            # extract header section of module; parameter and port lists are matched as balanced parentheses
+            # (skipping comments) so neither a ");" inside a comment nor instantiations in the body end the header
+            header_match = regex.search(
+                r"module\s+(?:(?:automatic|static)\s+)?(\w+)(?&sep)(?:import\b[^;]*+;(?&sep))*+"
+                r"(?:#(?&sep)(?<params>(?&list))(?&sep))?(?<ports>(?&list))?(?&sep);"
+                r"(?(DEFINE)(?<sep>(?:\s++|//[^\n]*+|/\*[\s\S]*?\*/)*+)(?<list>\((?:[^)(/]++|//[^\n]*+|/\*[\s\S]*?\*/|/|(?&list))*+\)))",
+                module
+            )
+
+            if header_match is not None:
+                param_declarations = header_match.group("params")
+                port_declarations = header_match.group("ports")
+            else:
+                # unsupported header: document the module by its name only instead of failing for the whole file
+                header_match = regex.search(r"module\s+(?:(?:automatic|static)\s+)?(\w+)", module)
+                if header_match is None:
+                    continue
+                param_declarations = None
+                port_declarations = None
 
             # extract name of module
-            mod_dict["name"] = regex.search(r"(?:module\s+(\w+))", header).groups()[0]
-
-            # extract param and port declarations
-            parenthesized_sections = regex.findall(r"\((?:[^)(]+|(?R))*+\)", header)
-            param_declarations = None
-            port_declarations = None
-
-            if len(parenthesized_sections) == 1:
-                # only port declarations, no params
-                port_declarations = parenthesized_sections[0]
-            elif len(parenthesized_sections) > 1:
-                # param and port declarations
-                param_declarations = parenthesized_sections[0]
-                port_declarations = parenthesized_sections[1]
+            mod_dict["name"] = header_match.group(1)
 
             if param_declarations != None:
                 param_list = []
@@ -101,29 +142,36 @@ class SystemVerilogParser(Parser):
             else:
                 mod_dict["ports"] = None
 
+            # extract instantiated modules from module body
+            mod_dict["instances"] = self.__extract_instances(module[header_match.end():])
+
             modules_list.append(mod_dict)
+            # docs_description comments document the whole file (see count_documentation), modules have no docstrings
+            elements.append({"name": mod_dict["name"], "kind": "module", "docstring": None, "lineno_start": lineno_start, "lineno_end": lineno})
 
-        return {"modules": modules_list, "docs": comments}
+        return {"elements": elements, "modules": modules_list, "docs": comments}
 
 
-    def make_docs(self):
-        """parses systemverilog files for modules and docs_description comments and generates AsciiDoc documentation from them
+    def __extract_instances(self, body: str) -> list[dict]:
+        """docs_exclude"""
+        # remove comments so commented-out instantiations are ignored
+        body = regex.sub(r"\/\/.*|\/\*[\s\S]*?\*\/", "", body)
 
-        inline comments or comment blocks starting with keyword 'docs_description' are included in the documentation
-        """
-        combined_ast = self.get_combined_ast()
+        instances = []
+        # <module> [#(...)] <instance> [[ranges]] (
+        for match in regex.finditer(r"(?:^|(?<=;))\s*(\w+)(?:\s*#\s*(?P<p>\((?:[^)(]+|(?&p))*+\))\s*|\s+)(\w+)\s*(?:\[[^][]*\]\s*)*\(", body, flags=regex.MULTILINE):
+            module_name, instance_name = match.group(1), match.group(3)
+            if module_name in self.SV_KEYWORDS or instance_name in self.SV_KEYWORDS:
+                continue
+            instances.append({"module": module_name, "name": instance_name})
 
-        dir_tree_str = self.make_dir_tree(combined_ast)
-        list_of_files = self.combined_ast_to_list_of_files(combined_ast)
+        return instances
 
-        if self.args.output == None:
-            print(dir_tree_str)
-        else:
-            data = {
-                "dir_tree": dir_tree_str,
-                "list_of_files": list_of_files
-            }
-            self.render_file_template(self.args.template_dir, self.args.template, data)
+
+    @classmethod
+    def add_arguments(cls, parser):
+        sv_opts = parser.add_argument_group('SystemVerilog Options')
+        sv_opts.add_argument("--instance-style", choices=cls.INSTANCE_STYLES, default="named", help="format of instance templates: named port connections (with directions) or .* wildcard")
 
 
     def create_arg_parser(self):
@@ -132,101 +180,59 @@ class SystemVerilogParser(Parser):
         return parser
 
 
-    def combined_ast_to_list_of_files(self, combined_ast: dict, flattened: Optional[list]=None) -> list:
-        """recursively converts combined abstract syntaxt tree to flattened list of files
+    def postprocess_file(self, file: dict) -> None:
+        for module in file["modules"]:
+            module["instance"] = self.make_instance(module)
+
+
+    def template_data(self, list_of_files: list) -> dict:
+        hierarchy_tree_str, hierarchy_cycles = self.make_hierarchy_tree(list_of_files)
+        return {"hierarchy_tree": hierarchy_tree_str, "hierarchy_cycles": hierarchy_cycles}
+
+
+    def make_hierarchy_tree(self, list_of_files: list) -> tuple[str, list[list[str]]]:
+        """builds instantiation graph of all parsed modules and converts it to tree-like output
 
         Parameters
         ----------
-        node:      dict
-                   (part of) combined abstract syntax tree to process
-        flattened: list, optional
-                   holds new contents already assembled by previous recursion steps
+        list_of_files: list
+                       flattened list of files generated by combined_ast_to_list_of_files
 
         Returns
         -------
-        list
-            flattened list of files
+        tuple of str and list of list of str
+            tree-like output of design hierarchy starting at each top-level module and modules of each cyclic instantiation
         """
-        if flattened is None:
-            flattened = []
-
-        unpacked = list(combined_ast.values())[0]
-        basename = list(combined_ast.keys())[0]
-
-        if unpacked["type"] == "file":
-            file = {"basename": basename}
-            file.update(unpacked)
-            file.update(unpacked["contents"])
-            del file["contents"]
-
-            for module in file["modules"]:
-                module["instance"] = self.make_instance(module)
-
-            flattened.append(file)
+        graph = hierarchy.build_instance_graph(module for file in list_of_files for module in file["modules"])
+        return hierarchy.make_hierarchy_tree(graph, hierarchy.find_top_modules(graph)), hierarchy.find_cycles(graph)
 
-        if unpacked["type"] == "directory":
-            children = unpacked["contents"].keys()
-            for c in children:
-                self.combined_ast_to_list_of_files({c: unpacked["contents"][c]}, flattened)
 
-        return flattened
-
-
-    def make_instance(self, module: dict) -> str:
+    def make_instance(self, module: dict, style: Optional[str]=None) -> str:
         """converts extracted module info to instance template str
 
         Parameters
         ----------
         module: dict
                 module data
+        style:  str, optional
+                one of INSTANCE_STYLES; defaults to value of command line option --instance-style
 
         Returns
         -------
         str
             instance template (str) of module
         """
-        lines = []
+        if style is None:
+            style = self.args.instance_style
 
         # if no params and ports (i.e. testbenches) -> "module <name> ();"
         if not module.get("params") and not module.get("ports"):
             return f"module {module['name']} ();"
 
-        # params
-        param_lines = []
-        if module.get("params"):
-            max_name_len = max(len(p["name"]) for p in module["params"])
-            default_strings = [f"// = {p['default_val']}" for p in module["params"]]
-            max_default_len = max(len(s) for s in default_strings)
-
-            for param in module["params"]:
-                name = param["name"]
-                default_str = f"// = {param['default_val']}"
-                line = f"    .{name.ljust(max_name_len)}()  {default_str.ljust(max_default_len)}"
-                if param.get("comment"):
-                    line += f"  {param['comment']}"
-                param_lines.append(line)
-
-        # ports
-        port_lines = []
-        if module.get("ports"):
-            max_name_len = max(len(p["name"]) for p in module["ports"])
-            range_strings = []
-            for p in module["ports"]:
-                if p.get("name_and_ranges"):
-                    range_strings.append(f"// {p['name_and_ranges']}")
-                else:
-                    range_strings.append("")
-            max_range_len = max(len(s) for s in range_strings)
-
-            for port in module["ports"]:
-                name = port["name"]
-                range_str = f"// {port['name_and_ranges']}" if port.get("name_and_ranges") else ""
-                line = f"    .{name.ljust(max_name_len)}()  {range_str.ljust(max_range_len)}"
-                if port.get("comment"):
-                    line += f"  {port['comment']}"
-                port_lines.append(line)
+        param_lines, port_lines = self.__make_instance_table(module, style)
 
         # combine everything
+        lines = []
         if param_lines:
             lines.append(f"{module['name']} (")
             lines.extend(param_lines)
@@ -234,16 +240,45 @@ class SystemVerilogParser(Parser):
         else:
             lines.append(f"{module['name']} i_{module['name']} (")
 
-        if port_lines:
-            lines.extend(port_lines)
-            lines.append(");")
+        if style == "wildcard":
+            lines[-1] += ".*);"
         else:
+            lines.extend(port_lines)
             lines.append(");")
 
         return "\n".join(lines)
 
 
+    def __make_instance_table(self, module: dict, style: str) -> tuple[list[str], list[str]]:
+        """docs_exclude"""
+        params = module.get("params") or []
+        ports = module.get("ports") or []
+
+        # tables are stored column by column so widths and formatting of all rows are computed in bulk
+        param_lines = align_columns(
+            [[p["name"] for p in params], [f"// = {p['default_val']}" for p in params]],
+            "    .{}()  {}",
+            [p["comment"] for p in params]
+        )
+
+        if style == "wildcard":
+            # ports are connected implicitly by name
+            return param_lines, []
+
+        names = list(map(itemgetter("name"), ports))
+        ranges = list(map(itemgetter("name_and_ranges"), ports))
+        comments = list(map(itemgetter("comment"), ports))
+
+        if style == "directions":
+            port_lines = align_columns([names, list(map(itemgetter("type"), ports)), ranges], "    .{}()  // {} {}", comments)
+        else:
+            port_lines = align_columns([names, ranges], "    .{}()  // {}", comments)
+
+        return param_lines, port_lines
+
+
 if __name__ == "__main__":
     systemverilog_parser = SystemVerilogParser()
     systemverilog_parser.make_docs()
     print("Done.")
+    sys.exit(systemverilog_parser.check_coverage())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""benchmarks SystemVerilogParser.make_instance on synthetic modules with many ports
+
+compare implementations by running the script against another checkout of the app directory, e.g.
+
+    git worktree add /tmp/docs-tools-base <rev>
+    python3 benchmarks/bench_instances.py
+    python3 benchmarks/bench_instances.py --app-dir /tmp/docs-tools-base/app
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+
+def make_module(num_ports: int, num_params: int, seed: int) -> dict:
+    """synthetic module data as returned by SystemVerilogParser.parse_file"""
+    rng = random.Random(seed)
+    return {
+        "name": "top",
+        "params": [{
+            "name": f"PARAM_{i}" * (i % 3 + 1),
+            "default_val": str(i) if i % 2 else None,
+            "comment": "// parameter" if i % 4 == 0 else None
+        } for i in range(num_params)],
+        "ports": [{
+            "type": rng.choice(["input", "output", "inout"]),
+            "name": f"sig_{i}",
+            "name_and_ranges": f"[{rng.randrange(64)}:0] sig_{i}",
+            "comment": "// port" if i % 3 == 0 else None
+        } for i in range(num_ports)]
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--app-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"), help="app directory of the implementation to benchmark")
+    arg_parser.add_argument("--ports", type=int, default=50000, help="number of ports per module")
+    arg_parser.add_argument("--params", type=int, default=20, help="number of params per module")
+    arg_parser.add_argument("--repeat", type=int, default=20, help="number of timed runs (best and median are reported)")
+    args = arg_parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.app_dir))
+    # the parser reads its options from the command line
+    sys.argv = [sys.argv[0], "."]
+    from sv_parser import SystemVerilogParser
+    parser = SystemVerilogParser()
+
+    module = make_module(args.ports, args.params, seed=0)
+    parser.make_instance(module)
+
+    times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        parser.make_instance(module)
+        times.append(time.perf_counter() - start)
+
+    times.sort()
+    print(f"make_instance ({args.ports} ports, {args.params} params): best {times[0] * 1000:.1f} ms, median {times[len(times) // 2] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""benchmarks PythonParser.parse_file on a synthetic class with many methods
+
+compare implementations by running the script against another checkout of the app directory, e.g.
+
+    git worktree add /tmp/docs-tools-base <rev>
+    python3 benchmarks/bench_py_signatures.py
+    python3 benchmarks/bench_py_signatures.py --app-dir /tmp/docs-tools-base/app
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+
+def make_source(num_methods: int) -> str:
+    """synthetic module with one class; every method has a multi-line signature, a docstring and a short body"""
+    methods = "".join(
+        f"    def method_{i}(self,\n"
+        f"                   value: int = {i},  # comment: with colon\n"
+        f"                   name: str = \"ä{i}\") -> str:\n"
+        f"        \"\"\"method {i}\"\"\"\n"
+        f"        return name * value\n\n"
+        for i in range(num_methods)
+    )
+    return f"class Big:\n    \"\"\"class with many methods\"\"\"\n\n{methods}"
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--app-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"), help="app directory of the implementation to benchmark")
+    arg_parser.add_argument("--methods", type=int, default=1000, help="number of methods of the class")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="number of timed runs (best and median are reported)")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "big.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(make_source(args.methods))
+
+        sys.path.insert(0, os.path.abspath(args.app_dir))
+        # the parser reads its options from the command line
+        sys.argv = [sys.argv[0], tmp_dir]
+        from py_parser import PythonParser
+        parser = PythonParser()
+
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            parser.parse_file(path)
+            times.append(time.perf_counter() - start)
+
+    times.sort()
+    print(f"parse_file ({args.methods} methods): best {times[0] * 1000:.1f} ms, median {times[len(times) // 2] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
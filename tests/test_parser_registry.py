@@ -0,0 +1,80 @@
+import sys
+
+import pytest
+
+import parser_registry
+from docs_parser import Parser
+from parser_registry import ParserRegistry
+
+
+class BaseMarkdownParser(Parser):
+    files_template = "markdown_files.adoc"
+
+    @property
+    def target_file_extensions(self):
+        return [".md"]
+
+    def parse_file(self, full_path):
+        return {"elements": [{"name": "title", "kind": "heading", "docstring": None, "lineno_start": 1, "lineno_end": 1}]}
+
+
+class MarkdownParser(BaseMarkdownParser):
+    pass
+
+
+class NoTemplateParser(BaseMarkdownParser):
+    files_template = None
+
+
+class OtherLanguageParser(BaseMarkdownParser):
+    language = "restructuredtext"
+
+
+class IncompleteResultParser(BaseMarkdownParser):
+    language = "incomplete"
+
+    def parse_file(self, full_path):
+        return {"headings": []}
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(parser_registry, "BUILTIN_PARSERS", {
+        "markdown": f"{__name__}:MarkdownParser",
+        "no_template": f"{__name__}:NoTemplateParser",
+        "other_language": f"{__name__}:OtherLanguageParser",
+        "incomplete": f"{__name__}:IncompleteResultParser",
+    })
+    return ParserRegistry()
+
+
+def test_load_sets_missing_language(registry):
+    assert registry.load("markdown").language == "markdown"
+
+
+def test_load_rejects_parser_without_files_template(registry):
+    with pytest.raises(TypeError, match="files_template"):
+        registry.load("no_template")
+
+
+def test_load_rejects_mismatching_language(registry):
+    with pytest.raises(TypeError, match="restructuredtext"):
+        registry.load("other_language")
+
+
+def test_files_with_incomplete_results_are_skipped(registry, monkeypatch, tmp_path):
+    (tmp_path / "README.md").write_text("# title\n")
+    (tmp_path / "NOTES.md").write_text("# notes\n")
+    monkeypatch.setattr(sys, "argv", ["parser", str(tmp_path)])
+
+    combined_ast = registry.load("incomplete")().get_combined_ast()
+    files = next(iter(combined_ast.values()))["contents"]
+
+    assert files["README.md"]["skipped"]["reason"] == "error"
+    assert "elements" in files["README.md"]["skipped"]["detail"]
+
+    combined_ast = registry.load("markdown")().get_combined_ast()
+    files = next(iter(combined_ast.values()))["contents"]
+
+    assert "skipped" not in files["README.md"]
+    assert files["README.md"]["coverage"] == {"documented": 0, "total": 1}
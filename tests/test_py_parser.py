@@ -0,0 +1,109 @@
+import ast
+import sys
+
+import pytest
+
+from py_parser import PythonParser
+
+
+SOURCE = '''\
+import functools
+
+
+def plain(a, b=1):
+    """docstring"""
+    return a
+
+
+def multi_line(
+    a: int,  # comment: with colon
+    b: str = "x: y",
+) -> dict[str, int]:
+    pass
+
+
+@functools.lru_cache(maxsize=None)
+def décoré(ä="ö€", *args, **kwargs): return ä
+
+
+def kurz(ä="öü"): return ä  # end_col_offset is a byte offset
+
+
+class Größe(dict):
+    """Klasse für Maße"""
+    def __init__(self, x="→"): self.x = x
+
+    @property
+    def wert(self) -> str:
+        return "ß"
+
+    async def not_a_function_def(self):
+        pass
+
+    def späť(self,
+             y="日本語: ok"):
+        pass
+
+
+class Plain: pass
+'''
+
+
+def reference_signature(source: str, node: ast.AST) -> str:
+    # signature as extracted by the original implementation (ast.get_source_segment of the whole node)
+    lines = []
+    for line in ast.get_source_segment(source, node).splitlines():
+        lines.append(line)
+        if line.split("#", 1)[0].rstrip().endswith(":"):
+            break
+    return "\n".join(lines)
+
+
+def reference_signatures(source: str) -> dict[int, str]:
+    signatures = {}
+    for node in ast.parse(source).body:
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            signatures[node.lineno] = reference_signature(source, node)
+        if isinstance(node, ast.ClassDef):
+            for child in node.body:
+                if isinstance(child, ast.FunctionDef):
+                    signatures[child.lineno] = reference_signature(source, child)
+    return signatures
+
+
+@pytest.fixture
+def parser(monkeypatch, tmp_path):
+    monkeypatch.setattr(sys, "argv", ["py_parser.py", str(tmp_path)])
+    return PythonParser()
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n", "\r"])
+def test_signatures_match_source_segments(parser, tmp_path, newline):
+    source = SOURCE.replace("\n", newline)
+    path = tmp_path / "example.py"
+    path.write_bytes(source.encode("utf-8"))
+
+    result = parser.parse_source(str(path), source)
+
+    elements = [*result["functions"], *result["classes"]]
+    for cls in result["classes"]:
+        elements.extend(cls["methods"])
+
+    expected = reference_signatures(source)
+    assert len(elements) == len(expected)
+
+    for elem in elements:
+        # decorators are prepended to the signature
+        signature = "\n".join(elem["signature"].split("\n")[len(elem["decorators"]):])
+        assert signature == expected[elem["lineno_start"]]
+
+
+def test_large_class_signatures(parser, tmp_path):
+    methods = "".join(f"    def method_{i}(self, ä{i}='ö'):\n        pass\n" for i in range(2000))
+    source = f"class Big:\n{methods}"
+
+    result = parser.parse_source(str(tmp_path / "big.py"), source)
+
+    methods = result["classes"][0]["methods"]
+    assert len(methods) == 2000
+    assert methods[-1]["signature"] == "def method_1999(self, ä1999='ö'):"